@@ -1,34 +1,36 @@
 import sys
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from collections import UserDict
-import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import gzip
 import pickle
+import pickletools
 
 
-# Валідація вводу та обробка помилок
+# Відновлення стану зі слотами після pickle
 
 
-def input_error(func):
-    def inner(*args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except IndexError:
-            return "Не достатньо аргументів. Будь ласка, дотримуйтесь формату команди."
-        except ValueError:
-            return "Некоректні дані. Переконайтеся, що ви вводите правильні типи даних."
-        except KeyError:
-            return "Контакт не знайдено."
-    return inner
+def restore_slots(obj, state):
+    # Слоти приходять як (None, {слоти}), файли старих версій - як словник __dict__
+    if isinstance(state, tuple):
+        state = state[1]
+    for name, value in state.items():
+        setattr(obj, name, value)
 
 
 # Базовий клас для полів запису
 
 
 class Field:
+    __slots__ = ("value",)  # Без __dict__ для кожного екземпляра
+
     def __init__(self, value):
         self.value = value  # Ініціалізація значення поля
 
+    def __setstate__(self, state):
+        restore_slots(self, state)
+
     def __str__(self):
         return str(self.value)  # Повертає строкове представлення поля
 
@@ -37,114 +39,270 @@ class Field:
 
 
 class Name(Field):
-    pass  # Наслідування базових властивостей класу Field
+    __slots__ = ()  # Наслідування базових властивостей класу Field
 
 
-# Клас для зберігання номера телефону з валідацією
+# Валідація номера телефону (номери зберігаються як звичайні рядки)
+
+
+def validate_phone(value):
+    # isascii() - перевірка прапорця рядка, відсікає не-ASCII цифри до isdigit()
+    if len(value) != 10 or not (value.isascii() and value.isdigit()):
+        raise ValueError("Номер телефону повинен містити рівно 10 цифр.")
+    return value
+
+
+# Клас Phone залишено лише для читання файлів старих версій, де телефони
+# зберігались як об'єкти; Record перетворює їх на рядки при завантаженні
 
 
 class Phone(Field):
-    def __init__(self, value):
-        if not re.fullmatch(r"\d{10}", value):
-            raise ValueError("Номер телефону повинен містити рівно 10 цифр.")
-        super().__init__(value)  # Виклик конструктора базового класу
+    __slots__ = ()
+
+
+# Ключ дня в році без урахування року: упакована пара (місяць, день)
+
+
+def day_key(d):
+    return (d.month << 5) | d.day
 
 
 # Клас для зберігання дати народження з валідацією
 
 
 class Birthday(Field):
+    __slots__ = ("doy",)
+
     def __init__(self, value):
+        # Ручний розбір DD.MM.YYYY замість datetime.strptime
         try:
-            self.value = datetime.strptime(value, '%d.%m.%Y').date()
+            # Лише ASCII-цифри, як і у validate_phone (isdigit() приймає й інші)
+            if not value.isascii():
+                raise ValueError
+            d, m, y = value.split('.')
+            # Ті самі межі, що й у '%d.%m.%Y': день і місяць до 2 цифр, рік - 4
+            if not (len(d) <= 2 and len(m) <= 2 and len(y) == 4):
+                raise ValueError
+            if not (d.isdigit() and m.isdigit() and y.isdigit()):
+                raise ValueError
+            self.value = date(int(y), int(m), int(d))
+            self.doy = day_key(self.value)  # Для швидкого порівняння без дат
         except ValueError:
             raise ValueError("Invalid date format. Use DD.MM.YYYY")
 
+    def __getstate__(self):
+        # doy - похідне поле, у файл не потрапляє
+        return {"value": self.value}
+
+    def __setstate__(self, state):
+        restore_slots(self, state)
+        self.doy = day_key(self.value)
+
+    def __str__(self):
+        v = self.value
+        return f"{v.day:02d}.{v.month:02d}.{v.year:04d}"
+
 
 # Клас для зберігання інформації про контакт
 
 
 class Record:
+    __slots__ = ("name", "phones", "birthday", "_phone_set", "_str_cache", "_book")
+
     def __init__(self, name):
         self.name = Name(name)  # Збереження імені як об'єкту класу Name
-        self.phones = []  # Ініціалізація списку телефонів
+        self.phones = []  # Ініціалізація списку телефонів (рядки)
+        self._phone_set = set()  # Множина номерів для швидкого пошуку
         self.birthday = None  # Ініціалізація дня народження
+        self._str_cache = None  # Кешоване строкове представлення
+        self._book = None  # Адресна книга, що містить запис
+
+    def __getstate__(self):
+        # У файл потрапляють лише дані; кеш рядка, множину телефонів і
+        # посилання на книгу __setstate__ та add_record відновлюють самі
+        return {"name": self.name, "phones": self.phones, "birthday": self.birthday}
+
+    def __setstate__(self, state):
+        restore_slots(self, state)
+        # Старі версії зберігали телефони як об'єкти Phone
+        self.phones = [getattr(p, "value", p) for p in self.phones]
+        self._phone_set = set(self.phones)
+        self._str_cache = None
+        self._book = None  # Книгу встановить add_record при завантаженні
 
     def add_phone(self, phone):
-        self.phones.append(Phone(phone))  # Додавання нового телефону
+        if phone in self._phone_set:
+            return  # Такий номер уже є у контакту
+        self.phones.append(validate_phone(phone))  # Додавання нового телефону
+        self._phone_set.add(phone)
+        self._str_cache = None
 
     def remove_phone(self, phone_number):
         # Видалення телефону
-        self.phones = [
-            phone for phone in self.phones if phone.value != phone_number]
+        if phone_number in self._phone_set:
+            self._phone_set.remove(phone_number)
+            self.phones.remove(phone_number)
+            self._str_cache = None
 
     def edit_phone(self, old_number, new_number):
-        found = False
-        for phone in self.phones:
-            if phone.value == old_number:
-                phone.value = new_number  # Оновлення номеру телефону
-                found = True
-                break
-        if not found:
+        if old_number not in self._phone_set:
             raise ValueError("Номер телефону не знайдено.")
+        validate_phone(new_number)
+        if new_number == old_number:
+            return
+        if new_number in self._phone_set:
+            self.remove_phone(old_number)  # Новий номер уже є у контакту
+            return
+        self.phones[self.phones.index(old_number)] = new_number  # Оновлення номеру телефону
+        self._phone_set.remove(old_number)
+        self._phone_set.add(new_number)
+        self._str_cache = None
 
     def find_phone(self, phone_number):
-        for phone in self.phones:
-            if phone.value == phone_number:
-                return phone  # Пошук телефону за номером
-        return None
+        # Пошук телефону за номером
+        return phone_number if phone_number in self._phone_set else None
 
     def add_birthday(self, birthday):
+        old = self.birthday
         self.birthday = Birthday(birthday)  # Додавання дня народження
+        self._str_cache = None
+        if self._book is not None:
+            self._book._reindex_birthday(self, old)
 
     def __str__(self):
-        phones = "; ".join(p.value for p in self.phones)
-        birthday = self.birthday.value.strftime(
-            '%d.%m.%Y') if self.birthday else "No birthday"
-        return f"Name: {self.name.value}, Phones: {phones}, Birthday: {birthday}"
+        if self._str_cache is None:
+            phones = "; ".join(self.phones)
+            birthday = str(self.birthday) if self.birthday else "No birthday"
+            self._str_cache = f"Name: {self.name.value}, Phones: {phones}, Birthday: {birthday}"
+        return self._str_cache
 
 
 # Клас для зберігання та управління записами
 
 
-class AddressBook(UserDict):
+class AddressBook(dict):
+    def __init__(self):
+        super().__init__()
+        # Відсортований індекс днів народження: ключі day_key і записи.
+        # Ключі (не більше 415) лежать у компактному масиві unsigned short
+        self._doy_keys = array("H")
+        self._doy_records = []
+
+    def _index_birthday(self, record):
+        if record.birthday is None:
+            return
+        key = record.birthday.doy
+        i = bisect_right(self._doy_keys, key)
+        self._doy_keys.insert(i, key)
+        self._doy_records.insert(i, record)
+
+    def _unindex_birthday(self, record, key):
+        # Запис шукається лише серед записів з тим самим ключем
+        lo = bisect_left(self._doy_keys, key)
+        hi = bisect_right(self._doy_keys, key, lo)
+        try:
+            i = self._doy_records.index(record, lo, hi)
+        except ValueError:
+            return
+        del self._doy_keys[i]
+        del self._doy_records[i]
+
+    def _reindex_birthday(self, record, old_birthday):
+        # Викликається з Record.add_birthday, коли день народження змінився
+        if old_birthday is not None:
+            self._unindex_birthday(record, old_birthday.doy)
+        self._index_birthday(record)
+
+    # Індекс оновлюється лише для запису, який додається або видаляється
+
+    def __setitem__(self, name, record):
+        old = self.get(name)
+        super().__setitem__(name, record)
+        if old is not None:
+            if old.birthday is not None:
+                self._unindex_birthday(old, old.birthday.doy)
+            old._book = None
+        record._book = self  # Запис повідомлятиме книгу про новий день народження
+        self._index_birthday(record)
+
+    def __delitem__(self, name):
+        record = self[name]
+        super().__delitem__(name)
+        if record.birthday is not None:
+            self._unindex_birthday(record, record.birthday.doy)
+        record._book = None
+
+    def __reduce__(self):
+        # Зберігаються лише записи; ключі та індекс відновлює add_record
+        return (AddressBook, (), {"records": list(self.values())})
+
+    def __setstate__(self, state):
+        if "records" in state:
+            records = state["records"]
+        else:
+            # Файли старих версій (UserDict) містять словник записів у "data"
+            records = state["data"].values()
+            AddressBook.__init__(self)  # Без виклику __init__ при розпакуванні
+        for record in records:
+            self.add_record(record)
+
     def add_record(self, record):
-        self.data[record.name.value] = record  # Додавання запису
+        # Інтернування імені: ключ і поле Name посилаються на один рядок.
+        # При завантаженні з файлу __setstate__ теж іде через add_record,
+        # тож ключі залишаються інтернованими між сесіями
+        key = record.name.value = sys.intern(record.name.value)
+        self[key] = record  # Додавання запису
 
     def find(self, name):
-        return self.data.get(name, None)  # Пошук запису за ім'ям
+        return self.get(name)  # Пошук запису за ім'ям
 
     def delete(self, name):
-        if name in self.data:
-            del self.data[name]  # Видалення запису
+        if name in self:
+            del self[name]  # Видалення запису
         else:
             raise KeyError("Запис не знайдено.")
 
     def get_upcoming_birthdays(self, days=7):
         today = datetime.today().date()
-        upcoming_birthdays = []
-        for record in self.data.values():
-            if record.birthday:
-                birthday = record.birthday.value.replace(year=today.year)
-                if today <= birthday <= today + timedelta(days=days):
-                    upcoming_birthdays.append(record)
-        return upcoming_birthdays
+        end = today + timedelta(days=days)
+        lo = day_key(today)
+        hi = day_key(end)
+        keys, records = self._doy_keys, self._doy_records
+        i = bisect_left(keys, lo)
+        if days >= 365:
+            return records[i:] + records[:i]  # Вікно охоплює весь рік
+        if lo <= hi:
+            return records[i:bisect_right(keys, hi)]
+        # Вікно переходить через Новий рік
+        return records[i:] + records[:bisect_right(keys, hi)]
 
 
 # Серіалізація з pickle
 
+# Поріг розміру, після якого pickletools.optimize вже не окупається
+OPTIMIZE_MAX_BYTES = 1024 * 1024
+
 
 def save_data(book, filename="addressbook.pkl"):
-    with open(filename, "wb") as f:
-        pickle.dump(book, f)
+    data = pickle.dumps(book, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) <= OPTIMIZE_MAX_BYTES:
+        data = pickletools.optimize(data)  # Видалення зайвих опкодів
+    # Стиснення з рівнем 1: майже без витрат CPU, значно менше байтів на диску
+    with gzip.open(filename, "wb", compresslevel=1) as f:
+        f.write(data)
 
 
 def load_data(filename="addressbook.pkl"):
     try:
         with open(filename, "rb") as f:
-            return pickle.load(f)
+            data = f.read()  # Читання всього файлу за один виклик
     except FileNotFoundError:
         return AddressBook()  # Повернення нової адресної книги, якщо файл не знайдено
+    # Старі версії зберігали pickle без стиснення; такі файли читаються як є,
+    # а старий формат класів перетворюють методи __setstate__
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    return pickle.loads(data)
 
 
 # Функції для обробки команд CLI
@@ -152,11 +310,10 @@ def load_data(filename="addressbook.pkl"):
 
 def parse_input(user_input):
     cmd, *args = user_input.split()  # Розбір введення на команду та аргументи
-    cmd = cmd.strip().lower()  # Нормалізація команди
+    cmd = cmd.lower()  # Нормалізація команди (split() уже прибрав пробіли)
     return cmd, args
 
 
-@input_error
 def add_contact(args, book: AddressBook):
     name, phone, *_ = args
     record = book.find(name)
@@ -170,7 +327,6 @@ def add_contact(args, book: AddressBook):
     return message
 
 
-@input_error
 def change_contact(args, book):
     if len(args) != 3:
         raise IndexError("Введіть ім'я, старий телефон і новий телефон.")
@@ -183,26 +339,23 @@ def change_contact(args, book):
         raise KeyError(f"Контакт '{name}' не знайдено.")
 
 
-@input_error
 def show_phone(args, book):
     if len(args) != 1:
         raise IndexError("Введіть точно одне ім'я.")
     name = args[0]
     record = book.find(name)
     if record:
-        return f"{name}: {'; '.join(phone.value for phone in record.phones)}"
+        return f"{name}: {'; '.join(record.phones)}"
     else:
         raise KeyError(f"Контакт '{name}' не знайдено.")
 
 
-@input_error
 def show_all(book):
-    if not book.data:
+    if not book:
         return "Контакти відсутні."
-    return "\n".join(str(record) for record in book.data.values())
+    return "\n".join(str(record) for record in book.values())
 
 
-@input_error
 def add_birthday(args, book):
     if len(args) != 2:
         raise IndexError(
@@ -216,7 +369,6 @@ def add_birthday(args, book):
         raise KeyError(f"Contact '{name}' not found.")
 
 
-@input_error
 def show_birthday(args, book):
     if len(args) != 1:
         raise IndexError("Please provide a name.")
@@ -224,14 +376,13 @@ def show_birthday(args, book):
     record = book.find(name)
     if record:
         if record.birthday:
-            return f"{name}'s birthday is on {record.birthday.value.strftime('%d.%m.%Y')}."
+            return f"{name}'s birthday is on {record.birthday}."
         else:
             return f"{name} does not have a birthday set."
     else:
         raise KeyError(f"Contact '{name}' not found.")
 
 
-@input_error
 def birthdays(args, book):
     upcoming_birthdays = book.get_upcoming_birthdays()
     if not upcoming_birthdays:
@@ -239,6 +390,21 @@ def birthdays(args, book):
     return "\n".join(str(record) for record in upcoming_birthdays)
 
 
+# Таблиця команд: ім'я команди -> обробник(args, book)
+COMMANDS = {
+    "hello": lambda args, book: "How can I help you?",
+    "add": add_contact,
+    "change": change_contact,
+    "phone": show_phone,
+    "all": lambda args, book: show_all(book),
+    "add-birthday": add_birthday,
+    "show-birthday": show_birthday,
+    "birthdays": birthdays,
+}
+
+EXIT_COMMANDS = frozenset(("close", "exit"))
+
+
 def main():
     book = load_data()  # Завантажити дані з файлу при запуску програми
     print("Welcome to the assistant bot!")  # Вітальне повідомлення
@@ -247,43 +413,25 @@ def main():
         user_input = input("Enter a command: ")
         command, args = parse_input(user_input)
 
-        if command in ["close", "exit"]:
+        if command in EXIT_COMMANDS:
             print("Good bye!")
             save_data(book)  # Зберегти дані перед виходом з програми
             break
 
-        elif command == "hello":
-            print("How can I help you?")
-
-        elif command == "add":
-            print(add_contact(args, book))
-
-        elif command == "change":
-            print(change_contact(args, book))
-
-        elif command == "phone":
-            print(show_phone(args, book))
-
-        elif command == "all":
-            print(show_all(book))
-
-        elif command == "add-birthday":
-            print(add_birthday(args, book))
-
-        elif command == "show-birthday":
-            print(show_birthday(args, book))
-
-        elif command == "birthdays":
-            print(birthdays(args, book))
-
-        elif command == "show-birthday":
-            print(show_birthday(args, book))
-
-        elif command == "birthdays":
-            print(birthdays(args, book))
+        handler = COMMANDS.get(command)
+        try:
+            if handler:
+                print(handler(args, book))
+            else:
+                print("Invalid command.")
 
-        else:
-            print("Invalid command.")
+        # Валідація вводу та обробка помилок для всіх команд
+        except IndexError:
+            print("Не достатньо аргументів. Будь ласка, дотримуйтесь формату команди.")
+        except ValueError:
+            print("Некоректні дані. Переконайтеся, що ви вводите правильні типи даних.")
+        except KeyError:
+            print("Контакт не знайдено.")
 
 
 if __name__ == "__main__":